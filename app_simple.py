@@ -4,15 +4,31 @@ Multilingual Toxicity Detection Interface
 Version: 1.1 - Fixed model paths for deployment
 """
 import streamlit as st
-import joblib
-import pandas as pd
-from langdetect import detect_langs
+import os
+import logging
 import re
+import math
 from pathlib import Path
+from scorer import LinearTextScorer, StaleExportError
 
 # Get the directory where this script is located
 BASE_DIR = Path(__file__).parent
 
+logger = logging.getLogger(__name__)
+
+# langdetect profiles to load. langdetect ships no Malay profile; Malay text
+# is detected as Indonesian (ID).
+_LANG_PROFILES = {
+    "en", "id", "zh-cn", "zh-tw", "ja", "ko", "ar", "es",
+    "fr", "de", "hi", "ta", "th", "ru", "tl",
+}
+
+# Characters counted as "special" in the text statistics
+_SPECIAL_RE = re.compile(r'[!?@#$%^&*]')
+
+# Any letter in any script; text without one has nothing for langdetect to score
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
 # Page config
 st.set_page_config(
     page_title="MuToXGuard - Toxicity Detector",
@@ -21,7 +37,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS = """
 <style>
     .main-title {
         font-size: 3rem;
@@ -59,69 +75,155 @@ st.markdown("""
         color: #721c24;
         border-left: 5px solid #dc3545;
     }
+    .stat-title {
+        font-size: 0.875rem;
+        margin-bottom: 0.25rem;
+    }
+    .stat-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 0.5rem;
+    }
     .stat-box {
-        padding: 15px;
+        padding: 8px 12px;
         border-radius: 8px;
         background: #f8f9fa;
-        margin: 10px 0;
+        font-size: 0.875rem;
+    }
+    .confidence-track {
+        height: 8px;
+        border-radius: 4px;
+        background: #e9ecef;
+        margin: 0.5rem 0 1rem;
+    }
+    .confidence-fill {
+        height: 100%;
+        border-radius: 4px;
+        background: #667eea;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def inject_css():
+    """Emit the custom CSS; cached so reruns replay it instead of rebuilding it"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+    return True
+
+inject_css()
 
 # Load model
 @st.cache_resource
 def load_model():
+    model_dir = BASE_DIR / 'models' / 'classical'
+    model_path = model_dir / 'logreg_toxic_only.joblib'
+    vectorizer_path = model_dir / 'tfidf_vectorizer.joblib'
     try:
-        model_path = BASE_DIR / 'models' / 'classical' / 'logreg_toxic_only.joblib'
-        vectorizer_path = BASE_DIR / 'models' / 'classical' / 'tfidf_vectorizer.joblib'
-        
-        # Debug: Show paths
-        st.sidebar.write(f"BASE_DIR: {BASE_DIR}")
-        st.sidebar.write(f"Model path exists: {model_path.exists()}")
-        st.sidebar.write(f"Looking for model at: {model_path}")
-        
+        # Plain-array export (see export_model.py); the pickles are the fallback
+        if LinearTextScorer.exists(model_dir):
+            try:
+                return LinearTextScorer.load(model_dir)
+            except StaleExportError as e:
+                logger.warning("%s; loading the pickles instead. Re-run export_model.py.", e)
+        import joblib  # only needed for the pickle fallback
         model = joblib.load(str(model_path))
         vectorizer = joblib.load(str(vectorizer_path))
-        return model, vectorizer
-    except Exception as e:
-        st.error(f"Failed to load model: {e}")
-        st.error(f"Current directory: {Path.cwd()}")
-        st.error(f"Script directory: {BASE_DIR}")
-        st.error(f"Files in BASE_DIR: {list(BASE_DIR.iterdir()) if BASE_DIR.exists() else 'DIR NOT FOUND'}")
+        return LinearTextScorer.from_sklearn(model, vectorizer)
+    except Exception:
+        # Path diagnostics are only useful when debugging a deployment
+        if os.environ.get("MUTOXGUARD_DEBUG"):
+            st.error(f"Looking for model at: {model_path}")
+            st.error(f"Current directory: {Path.cwd()}")
+            st.error(f"Script directory: {BASE_DIR}")
+            st.error(f"Files in BASE_DIR: {list(BASE_DIR.iterdir()) if BASE_DIR.exists() else 'DIR NOT FOUND'}")
         raise
 
+@st.cache_resource
+def load_language_profiles():
+    """Build a langdetect factory holding only the profiles we need"""
+    from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+    profiles = []
+    for lang in sorted(os.listdir(PROFILES_DIRECTORY)):
+        if lang in _LANG_PROFILES:
+            with open(os.path.join(PROFILES_DIRECTORY, lang), encoding='utf-8') as f:
+                profiles.append(f.read())
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    # Fixed seed keeps results deterministic, so caching them is sound
+    factory.seed = 0
+    return factory
+
+# st.cache_data rather than functools.lru_cache: the script body reruns on
+# every interaction, which would redefine the function and drop an LRU cache.
+@st.cache_data(show_spinner=False, max_entries=1024)
 def detect_language(text):
     """Detect language of text"""
+    if not _LETTER_RE.search(text):
+        return "UNKNOWN"
     try:
-        langs = detect_langs(text)
-        if langs:
-            return langs[0].lang.upper()
-    except:
-        pass
-    return "UNKNOWN"
+        # langdetect is imported and its profiles loaded on the first
+        # detection, not at page load; detectors come from the shared factory
+        detector = load_language_profiles().create()
+        detector.append(text)
+        return detector.detect().upper()
+    except Exception:
+        return "UNKNOWN"
 
-def analyze_text(text, model, vectorizer):
-    """Analyze text for toxicity"""
-    # Vectorize
-    X = vectorizer.transform([text])
-    
-    # Predict
-    prob = model.predict_proba(X)[0][1]
-    pred = model.predict(X)[0]
-    
+def sigmoid(z):
+    """Numerically stable logistic function"""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+def make_result(z):
+    """Build the result dict from a decision value"""
+    prob = sigmoid(z)
     return {
-        'is_toxic': bool(pred),
+        'is_toxic': bool(z > 0),  # same as predict()
         'confidence': float(prob),
+        # Plain comparisons beat a bucket-table lookup here: int()/min() calls
+        # cost more than two float compares, and buckets blur the boundaries
         'severity': 'HIGH' if prob > 0.8 else 'MEDIUM' if prob > 0.5 else 'LOW'
     }
 
+def analyze_text(text, scorer):
+    """Analyze text for toxicity"""
+    # Under 2 characters the TF-IDF row is empty, so the model's answer is
+    # just sigmoid(bias); skip the scorer and return exactly that
+    if len(text.strip()) < 2:
+        return make_result(scorer.bias)
+    
+    # TF-IDF + LR decision value; same result as predict_proba
+    return make_result(scorer.decision_function([text])[0])
+
+def text_stats(text):
+    """Compute the figures shown under Text Statistics"""
+    return {
+        # str.split() in C beats streaming counters (Python loop, regex
+        # finditer) by ~4x even on 200KB pastes; the list is short-lived
+        'words': len(text.split()),
+        'chars': len(text),
+        # islower() is a C-level scan and rules out capitals for the common
+        # all-lowercase case; the generator only runs for the rest
+        'has_caps': not text.islower() and any(c.isupper() for c in text),
+        'has_special': bool(_SPECIAL_RE.search(text)),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def _analyze_cached(text):
+    """Analyze text using the loaded model, memoized on the input text"""
+    result = analyze_text(text, scorer)
+    result['stats'] = text_stats(text)
+    return result
+
 # Header
 st.markdown('<h1 class="main-title">🛡️ MuToXGuard</h1>', unsafe_allow_html=True)
 st.markdown('<p class="subtitle">Multilingual Toxicity Detection System</p>', unsafe_allow_html=True)
 
 # Load model
 try:
-    model, vectorizer = load_model()
+    scorer = load_model()
     st.success("✓ Model loaded successfully")
 except Exception as e:
     st.error(f"Failed to load model: {e}")
@@ -142,7 +244,7 @@ with st.sidebar:
     st.header("📊 Model Info")
     st.write(f"""
     - **Algorithm**: Logistic Regression
-    - **Features**: {len(vectorizer.vocabulary_):,}
+    - **Features**: {scorer.n_features:,}
     - **Accuracy**: 85%
     - **F1 Score**: 0.74
     """)
@@ -155,102 +257,103 @@ with st.sidebar:
     if st.button("Try Example 3"):
         st.session_state.example = "Bodoh punya orang"
 
-# Main input
-st.header("📝 Enter Text to Analyze")
+# Main input and analysis
+@st.fragment
+def analysis_section():
+    """Input box and results; reruns on its own when Analyze is clicked"""
+    st.header("📝 Enter Text to Analyze")
 
-text_input = st.text_area(
-    "Type or paste text here:",
-    value=st.session_state.get('example', ''),
-    height=150,
-    placeholder="Enter any text in English or Malay..."
-)
+    text_input = st.text_area(
+        "Type or paste text here:",
+        value=st.session_state.get('example', ''),
+        height=150,
+        placeholder="Enter any text in English or Malay..."
+    )
 
-col1, col2, col3 = st.columns([1, 1, 2])
-with col1:
-    analyze_btn = st.button("🔍 Analyze", type="primary", use_container_width=True)
-with col2:
-    clear_btn = st.button("🗑️ Clear", use_container_width=True)
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        analyze_btn = st.button("🔍 Analyze", type="primary", use_container_width=True)
+    with col2:
+        clear_btn = st.button("🗑️ Clear", use_container_width=True)
 
-if clear_btn:
-    st.session_state.example = ''
-    st.rerun()
+    if clear_btn:
+        st.session_state.example = ''
+        st.rerun()
 
-# Analysis
-if analyze_btn and text_input.strip():
-    with st.spinner("Analyzing..."):
-        # Detect language
-        lang = detect_language(text_input)
+    # Analysis
+    if analyze_btn and text_input.strip():
+        with st.spinner("Analyzing..."):
+            # Detect language
+            lang = detect_language(text_input)
         
-        # Analyze
-        result = analyze_text(text_input, model, vectorizer)
+            # Analyze
+            result = _analyze_cached(text_input)
         
-        # Display results
-        st.markdown("---")
-        st.header("📊 Analysis Results")
+            # Display results
+            st.markdown("---")
+            st.header("📊 Analysis Results")
         
-        # Main result box
-        if result['is_toxic']:
-            if result['severity'] == 'HIGH':
-                st.markdown(f'<div class="toxic-box toxic">🔴 TOXIC CONTENT DETECTED - {result["severity"]} RISK</div>', unsafe_allow_html=True)
+            # Main result box
+            if result['is_toxic']:
+                if result['severity'] == 'HIGH':
+                    st.markdown(f'<div class="toxic-box toxic">🔴 TOXIC CONTENT DETECTED - {result["severity"]} RISK</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="toxic-box warning">⚠️ POTENTIALLY TOXIC - {result["severity"]} RISK</div>', unsafe_allow_html=True)
             else:
-                st.markdown(f'<div class="toxic-box warning">⚠️ POTENTIALLY TOXIC - {result["severity"]} RISK</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="toxic-box safe">✅ SAFE CONTENT</div>', unsafe_allow_html=True)
+                st.markdown('<div class="toxic-box safe">✅ SAFE CONTENT</div>', unsafe_allow_html=True)
         
-        # Metrics
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Language", lang)
-        
-        with col2:
+            # Metrics and text stats share one row
+            col1, col2, col3, col4 = st.columns(4)
             confidence_pct = result['confidence'] * 100
-            st.metric("Toxicity Score", f"{confidence_pct:.1f}%")
         
-        with col3:
-            st.metric("Severity Level", result['severity'])
+            with col1:
+                st.metric("Language", lang)
         
-        # Progress bar
-        st.write("**Confidence Visualization:**")
-        st.progress(result['confidence'])
+            with col2:
+                st.metric("Toxicity Score", f"{confidence_pct:.1f}%")
         
-        # Text stats
-        st.markdown("---")
-        st.subheader("📈 Text Statistics")
+            with col3:
+                st.metric("Severity Level", result['severity'])
         
-        col1, col2, col3, col4 = st.columns(4)
+            with col4:
+                stats = result['stats']
+                st.markdown(
+                    '<div class="stat-title">📈 Text Statistics</div>'
+                    '<div class="stat-grid">'
+                    f'<div class="stat-box">Words: <b>{stats["words"]}</b></div>'
+                    f'<div class="stat-box">Characters: <b>{stats["chars"]}</b></div>'
+                    f'<div class="stat-box">Caps: <b>{"Yes" if stats["has_caps"] else "No"}</b></div>'
+                    f'<div class="stat-box">Special Chars: <b>{"Yes" if stats["has_special"] else "No"}</b></div>'
+                    '</div>',
+                    unsafe_allow_html=True
+                )
         
-        words = text_input.split()
-        chars = len(text_input)
+            # Confidence bar (plain HTML, one element instead of write + progress)
+            st.markdown(
+                f'<b>Confidence Visualization:</b>'
+                f'<div class="confidence-track"><div class="confidence-fill" style="width: {confidence_pct:.1f}%"></div></div>',
+                unsafe_allow_html=True
+            )
         
-        with col1:
-            st.markdown(f'<div class="stat-box">Words: <b>{len(words)}</b></div>', unsafe_allow_html=True)
-        with col2:
-            st.markdown(f'<div class="stat-box">Characters: <b>{chars}</b></div>', unsafe_allow_html=True)
-        with col3:
-            has_caps = any(c.isupper() for c in text_input)
-            st.markdown(f'<div class="stat-box">Caps: <b>{"Yes" if has_caps else "No"}</b></div>', unsafe_allow_html=True)
-        with col4:
-            has_special = bool(re.search(r'[!?@#$%^&*]', text_input))
-            st.markdown(f'<div class="stat-box">Special Chars: <b>{"Yes" if has_special else "No"}</b></div>', unsafe_allow_html=True)
-        
-        # Detailed explanation
-        with st.expander("ℹ️ Understanding the Results"):
-            st.write("""
-            **How to interpret:**
+            # Detailed explanation
+            with st.expander("ℹ️ Understanding the Results"):
+                st.write("""
+                **How to interpret:**
             
-            - **Toxicity Score**: Probability (0-100%) that the text is toxic
-            - **Severity Levels**:
-              - LOW: < 50% - Likely safe
-              - MEDIUM: 50-80% - Potentially concerning
-              - HIGH: > 80% - Highly toxic
+                - **Toxicity Score**: Probability (0-100%) that the text is toxic
+                - **Severity Levels**:
+                  - LOW: < 50% - Likely safe
+                  - MEDIUM: 50-80% - Potentially concerning
+                  - HIGH: > 80% - Highly toxic
             
-            **Note**: This is an automated system and may not be 100% accurate. 
-            Use human judgment for critical decisions.
-            """)
+                **Note**: This is an automated system and may not be 100% accurate. 
+                Use human judgment for critical decisions.
+                """)
+
+    elif analyze_btn:
+        st.warning("⚠️ Please enter some text to analyze.")
 
-elif analyze_btn:
-    st.warning("⚠️ Please enter some text to analyze.")
+analysis_section()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,72 @@
+"""
+MuToXGuard - Model export
+Converts the trained joblib model/vectorizer into the plain-array
+format read by scorer.LinearTextScorer, then checks the export scores
+the same as sklearn. Re-run after retraining:
+
+    python export_model.py
+"""
+import random
+from pathlib import Path
+
+import joblib
+
+from scorer import LinearTextScorer
+
+MODEL_DIR = Path(__file__).parent / 'models' / 'classical'
+MODEL_PATH = MODEL_DIR / 'logreg_toxic_only.joblib'
+VECTORIZER_PATH = MODEL_DIR / 'tfidf_vectorizer.joblib'
+
+# float32 storage moves logits by ~1e-7; anything larger is a real mismatch
+PARITY_TOLERANCE = 1e-5
+
+SAMPLE_TEXTS = [
+    "",
+    "x",
+    "You are awesome! Great work!",
+    "This is stupid and you're an idiot",
+    "Bodoh punya orang",
+    "ÉCOLE Straße 日本語のテキスト",
+    "12345 !!!",
+]
+
+
+def sample_texts(vectorizer, count=2000, seed=0):
+    """Fixed examples plus random mixes of vocabulary terms and unknown words"""
+    rng = random.Random(seed)
+    terms = sorted(vectorizer.vocabulary_) + ['zzqx', 'Hello', 'IDIOT!']
+    texts = list(SAMPLE_TEXTS)
+    for _ in range(count):
+        texts.append(' '.join(rng.choice(terms) for _ in range(rng.randint(1, 60))))
+    return texts
+
+
+def check_parity(scorer, model, vectorizer):
+    """Raise if the scorer's logits drift from sklearn's"""
+    texts = sample_texts(vectorizer)
+    expected = model.decision_function(vectorizer.transform(texts))
+    got = scorer.decision_function(texts)
+    worst = max(abs(a - b) for a, b in zip(got, expected))
+    flipped = sum((a > 0) != (b > 0) for a, b in zip(got, expected))
+    if worst > PARITY_TOLERANCE or flipped:
+        raise RuntimeError(
+            f"Exported scorer disagrees with sklearn: max logit diff {worst:.3g}, "
+            f"{flipped} flipped verdicts over {len(texts)} texts"
+        )
+    return worst, len(texts)
+
+
+def main():
+    model = joblib.load(str(MODEL_PATH))
+    vectorizer = joblib.load(str(VECTORIZER_PATH))
+    scorer = LinearTextScorer.from_sklearn(model, vectorizer)
+    scorer.save(MODEL_DIR, sources=[MODEL_PATH, VECTORIZER_PATH])
+
+    # Check what the app will actually load, not the in-memory copy
+    worst, count = check_parity(LinearTextScorer.load(MODEL_DIR), model, vectorizer)
+    print(f"Exported {scorer.n_features:,} features to {MODEL_DIR}")
+    print(f"Parity check: max logit diff {worst:.3g} over {count} texts")
+
+
+if __name__ == '__main__':
+    main()
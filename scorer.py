@@ -0,0 +1,157 @@
+"""
+MuToXGuard - Lightweight TF-IDF + Logistic Regression scorer
+Reproduces TfidfVectorizer.transform + LogisticRegression.decision_function
+from plain arrays, so the app can load the model without importing or
+unpickling sklearn on every cold start.
+"""
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+META_FILE = 'scorer_meta.json'
+IDF_FILE = 'scorer_idf.npy'
+COEF_FILE = 'scorer_coef.npy'
+
+
+class StaleExportError(ValueError):
+    """The exported scorer no longer matches the pickles it was built from"""
+
+
+def file_digest(path):
+    """sha256 of a file; ties an export to the pickles it came from"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class LinearTextScorer:
+    """Word n-gram TF-IDF (l2 norm) followed by a linear decision function"""
+
+    def __init__(self, vocabulary, idf, weights, bias,
+                 token_pattern=r"(?u)\b\w\w+\b", ngram_range=(1, 1), lowercase=True):
+        self.vocabulary = vocabulary
+        # Plain lists: a single text needs only a handful of scalar lookups,
+        # and list indexing is ~10x faster than indexing numpy arrays
+        self.idf = np.asarray(idf).tolist()
+        self.weights = np.asarray(weights).tolist()
+        self.bias = float(bias)
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self._token_re = re.compile(token_pattern)
+
+    @property
+    def n_features(self):
+        return len(self.vocabulary)
+
+    def term_counts(self, text):
+        """Count in-vocabulary n-grams, keyed by feature index"""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        min_n, max_n = self.ngram_range
+        grams = []
+        for n in range(min_n, max_n + 1):
+            if n == 1:
+                grams.extend(tokens)
+            else:
+                grams.extend(map(' '.join, zip(*[tokens[k:] for k in range(n)])))
+        # Count every n-gram at C speed, then keep the in-vocabulary ones
+        vocab = self.vocabulary
+        counts = {}
+        for gram, count in Counter(grams).items():
+            idx = vocab.get(gram)
+            if idx is not None:
+                counts[idx] = count
+        return counts
+
+    def decision_function(self, texts):
+        """Logit of the positive class for each text"""
+        idf = self.idf
+        weights = self.weights
+        scores = []
+        for text in texts:
+            # One pass over the non-zero features computes both the dot
+            # product and the l2 norm of the TF-IDF row
+            dot = 0.0
+            sq = 0.0
+            for idx, count in self.term_counts(text).items():
+                value = count * idf[idx]
+                dot += value * weights[idx]
+                sq += value * value
+            # An empty row stays zero after normalization
+            scores.append(dot / math.sqrt(sq) + self.bias if sq else self.bias)
+        return scores
+
+    @classmethod
+    def from_sklearn(cls, model, vectorizer):
+        """Build a scorer from a fitted TfidfVectorizer and binary LogisticRegression"""
+        if len(model.classes_) != 2:
+            raise ValueError(f"Expected a binary model, got classes {list(model.classes_)}")
+        params = vectorizer.get_params()
+        required = {
+            'analyzer': 'word', 'binary': False, 'norm': 'l2', 'preprocessor': None,
+            'stop_words': None, 'strip_accents': None, 'sublinear_tf': False,
+            'tokenizer': None, 'use_idf': True,
+        }
+        for name, expected in required.items():
+            if params[name] != expected:
+                raise ValueError(f"Unsupported vectorizer setting {name}={params[name]!r}")
+        # Round through float32, the export's storage format, so the pickle
+        # fallback scores exactly like a loaded export
+        return cls(
+            vocabulary={term: int(i) for term, i in vectorizer.vocabulary_.items()},
+            idf=vectorizer.idf_.astype(np.float32),
+            weights=model.coef_[0].astype(np.float32),
+            bias=model.intercept_[0],
+            token_pattern=params['token_pattern'],
+            ngram_range=params['ngram_range'],
+            lowercase=params['lowercase'],
+        )
+
+    def save(self, directory, sources=()):
+        """Write the scorer as JSON metadata plus .npy arrays
+
+        ``sources`` are the files the scorer was built from; their digests
+        are recorded so load() can tell when the export is out of date.
+        """
+        directory = Path(directory)
+        meta = {
+            'sources': {Path(p).name: file_digest(p) for p in sources},
+            'vocabulary': self.vocabulary,
+            'bias': self.bias,
+            'token_pattern': self.token_pattern,
+            'ngram_range': list(self.ngram_range),
+            'lowercase': self.lowercase,
+        }
+        (directory / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+        np.save(directory / IDF_FILE, np.asarray(self.idf, dtype=np.float32))
+        np.save(directory / COEF_FILE, np.asarray(self.weights, dtype=np.float32))
+
+    @classmethod
+    def load(cls, directory):
+        """Load a saved scorer from JSON and .npy files, without sklearn"""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text(encoding='utf-8'))
+        # A missing source is fine (deployed without the pickles); a changed one is not
+        for name, digest in meta.get('sources', {}).items():
+            path = directory / name
+            if path.exists() and file_digest(path) != digest:
+                raise StaleExportError(f"{name} changed since the scorer was exported")
+        return cls(
+            vocabulary=meta['vocabulary'],
+            idf=np.load(directory / IDF_FILE),
+            weights=np.load(directory / COEF_FILE),
+            bias=meta['bias'],
+            token_pattern=meta['token_pattern'],
+            ngram_range=meta['ngram_range'],
+            lowercase=meta['lowercase'],
+        )
+
+    @staticmethod
+    def exists(directory):
+        directory = Path(directory)
+        return all((directory / f).exists() for f in (META_FILE, IDF_FILE, COEF_FILE))